@@ -5,16 +5,111 @@ Tests the complete flow: IAM Token → Service CRN → Backends → Job Submissi
 """
 
 import requests
+import os
 import json
+import hashlib
+import heapq
 import time
 import math
+import functools
+import random
+import urllib.parse
+import pathlib
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to stdlib json
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps_bytes(obj):
+        """Pretty-print obj as UTF-8 encoded JSON"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+else:
+    _loads = json.loads
+
+    def _dumps_bytes(obj):
+        """Pretty-print obj as UTF-8 encoded JSON"""
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+
+def _dumps(obj):
+    """Pretty-print obj as JSON text"""
+    return _dumps_bytes(obj).decode("utf-8")
+
+try:
+    import numpy as np
+except ImportError:  # Optional: count analysis falls back to a Python loop
+    np = None
 
 # Configuration
-API_KEY = os.environ.get("IBM_QUANTUM_API_KEY", "YOUR_IBM_QUANTUM_API_KEY")
+API_KEY = os.environ.get("IBM_QUANTUM_API_KEY", "")
 IAM_TOKEN_URL = "https://iam.cloud.ibm.com/identity/token"
+# Form-encoded IAM request body, built once from the API key
+IAM_BODY = (
+    "grant_type=urn:ibm:params:oauth:grant-type:apikey"
+    f"&apikey={urllib.parse.quote(API_KEY, safe='')}"
+).encode("ascii")
 QUANTUM_API_URL = "https://quantum.cloud.ibm.com/api/v1"
 RESOURCE_CONTROLLER_URL = "https://resource-controller.cloud.ibm.com/v2/resource_instances"
+IBM_API_VERSION = "2025-05-01"
+# SQ_VERBOSE=1 prints every step's details; otherwise one line per finished step
+VERBOSE = os.environ.get("SQ_VERBOSE", "0") == "1"
+QISKIT_RUNTIME_RESOURCE_ID = "b6049020-80f4-11eb-a0f7-e35ec9b4054f"
+
+# IAM token / Service CRN cache. A cached token is only reused if it outlives
+# a whole run: step 5's 300s polling window plus request timeouts and retries.
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "swiftquantum", "iam.json")
+TOKEN_EXPIRY_MARGIN = 600
+# Step 3 statuses meaning a cached token was revoked or the cached CRN is gone
+STALE_CREDENTIAL_STATUS = (401, 403, 404)
+
+# Read size for streaming the step 6 results body
+RESULTS_CHUNK_SIZE = 65536
+
+# Test results are saved next to this script
+RESULTS_PATH = pathlib.Path(__file__).parent / "test_results.json"
+
+# Rz angle used by the Heron H-gate decomposition
+PI_2 = math.pi / 2
+
+# Bell state outcomes |00⟩ and |11⟩ (binary and hex bitstring formats)
+BELL_CORRELATED_KEYS = frozenset(["00", "11", "0x0", "0x3"])
+COUNTS_PREVIEW_SIZE = 10
+# Below this many distinct outcomes the plain Python loop beats numpy setup cost.
+# The default Bell State job measures 2 classical bits (at most 4 outcomes), so
+# the numpy path only runs for wider circuits submitted through qasm_list.
+NUMPY_MIN_OUTCOMES = 256
+
+# Job status polling: exponential backoff (seconds) with ±20% jitter
+POLL_BASE_DELAY = 0.5
+POLL_MAX_DELAY = 10
+
+# Shared HTTP session: keeps TCP+TLS connections to IAM, Resource Controller
+# and Quantum API alive across steps (especially the step 5 polling loop).
+# Throttling (429, honoring Retry-After) and transient 5xx errors are retried
+# by urllib3 for GETs only; the last response is returned so each step can log
+# its status. POSTs (IAM token, job submission) are retried only when the
+# connection could not be opened, so a job is never submitted twice.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+))
+
+# Shared read-only fallback for missing/non-dict nested fields
+_EMPTY = {}
 
 # Store results for documentation
 test_results = {
@@ -25,11 +120,14 @@ test_results = {
 
 def log_step(step_num, title, status, details=None, error=None):
     """Log a test step for documentation"""
+    if isinstance(error, bytes):
+        # Raw response body: decode as UTF-8 directly, skipping charset detection
+        error = error.decode("utf-8", "replace")
     result = {
         "step": step_num,
         "title": title,
         "status": status,
-        "timestamp": datetime.now().isoformat(),
+        "ts_ns": time.time_ns(),
         "details": details
     }
     if error:
@@ -38,28 +136,65 @@ def log_step(step_num, title, status, details=None, error=None):
     test_results["steps"].append(result)
 
     status_icon = "✅" if status == "success" else "❌" if status == "error" else "⏳"
-    print(f"\n{'='*60}")
-    print(f"{status_icon} Step {step_num}: {title}")
-    print(f"{'='*60}")
+    if not VERBOSE:
+        if status == "in_progress":
+            return
+        print(f"{status_icon} Step {step_num}: {title}")
+        if status != "error":
+            return
+    else:
+        print(f"\n{'='*60}")
+        print(f"{status_icon} Step {step_num}: {title}")
+        print(f"{'='*60}")
     if details:
-        print(json.dumps(details, indent=2, ensure_ascii=False) if isinstance(details, dict) else details)
+        print(_dumps(details) if isinstance(details, dict) else details)
     if error:
         print(f"❌ Error: {error}")
 
+def _render_step(step):
+    """Copy of a step record with ts_ns replaced, in place, by an ISO timestamp"""
+    rendered = {}
+    for key, value in step.items():
+        if key == "ts_ns":
+            rendered["timestamp"] = datetime.fromtimestamp(value / 1e9).isoformat()
+        else:
+            rendered[key] = value
+    return rendered
+
+def render_results(results):
+    """Copy of results with step ts_ns stamps rendered as ISO timestamps"""
+    rendered = dict(results)
+    rendered["steps"] = [_render_step(step) for step in results["steps"]]
+    return rendered
+
+def save_results(results, path=RESULTS_PATH):
+    """
+    Write results to path unless the file already has identical content.
+
+    A fresh run always differs (step timestamps, job id), so the skip only
+    applies when the same results are saved again. The size check keeps
+    the common case from reading the old file at all.
+    """
+    blob = _dumps_bytes(render_results(results))
+    if path.exists() and path.stat().st_size == len(blob) and path.read_bytes() == blob:
+        return False
+    path.write_bytes(blob)
+    return True
+
 def step1_get_iam_token():
     """Step 1: Acquire IAM Token from API Key"""
     log_step(1, "IAM Token 획득", "in_progress")
 
     try:
-        response = requests.post(
+        response = SESSION.post(
             IAM_TOKEN_URL,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
-            data=f"grant_type=urn:ibm:params:oauth:grant-type:apikey&apikey={API_KEY}",
+            data=IAM_BODY,
             timeout=30
         )
 
         if response.status_code == 200:
-            data = response.json()
+            data = _loads(response.content)
             token = data.get("access_token")
             expires_in = data.get("expires_in", 3600)
 
@@ -69,33 +204,30 @@ def step1_get_iam_token():
                 "expires_in": f"{expires_in}초 ({expires_in//60}분)",
                 "token_preview": f"{token[:50]}...{token[-20:]}" if token else None
             })
-            return token
+            return token, expires_in
         else:
             log_step(1, "IAM Token 획득", "error",
                     {"status_code": response.status_code},
-                    response.text)
-            return None
+                    response.content)
+            return None, None
 
     except Exception as e:
         log_step(1, "IAM Token 획득", "error", error=str(e))
-        return None
+        return None, None
 
 def step2_get_service_crn(bearer_token):
     """Step 2: Get Qiskit Runtime Service CRN"""
     log_step(2, "Service CRN 조회", "in_progress")
 
     try:
-        # resource_id for Qiskit Runtime
-        qiskit_runtime_resource_id = "b6049020-80f4-11eb-a0f7-e35ec9b4054f"
-
-        response = requests.get(
-            f"{RESOURCE_CONTROLLER_URL}?resource_id={qiskit_runtime_resource_id}",
+        response = SESSION.get(
+            f"{RESOURCE_CONTROLLER_URL}?resource_id={QISKIT_RUNTIME_RESOURCE_ID}",
             headers={"Authorization": f"Bearer {bearer_token}"},
             timeout=30
         )
 
         if response.status_code == 200:
-            data = response.json()
+            data = _loads(response.content)
             resources = data.get("resources", [])
 
             if resources:
@@ -120,51 +252,147 @@ def step2_get_service_crn(bearer_token):
         else:
             log_step(2, "Service CRN 조회", "error",
                     {"status_code": response.status_code},
-                    response.text)
+                    response.content)
             return None
 
     except Exception as e:
         log_step(2, "Service CRN 조회", "error", error=str(e))
         return None
 
+def _api_key_fingerprint():
+    """Identify the API key a cache entry belongs to without storing the key"""
+    return hashlib.sha256(API_KEY.encode("utf-8")).hexdigest()[:16]
+
+def load_cache():
+    """Load the token/CRN cache, ignoring entries written for another API key"""
+    try:
+        with open(CACHE_PATH, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("api_key") != _api_key_fingerprint():
+        return {}
+    return cache
+
+def save_cache(cache):
+    """Persist the token/CRN cache readable by the current user only"""
+    cache["api_key"] = _api_key_fingerprint()
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        fd = os.open(CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f)
+        os.chmod(CACHE_PATH, 0o600)
+    except OSError as e:
+        print(f"  ⚠️ Cache write failed: {e}")
+
+def clear_cached_credentials():
+    """Drop the cached token and Service CRN so the next lookup hits the API"""
+    cache = load_cache()
+    for key in ("token", "expiry", "service_crn"):
+        cache.pop(key, None)
+    save_cache(cache)
+
+def get_cached_iam_token(use_cache=True):
+    """
+    Step 1 (cached): Reuse the IAM token while it outlives TOKEN_EXPIRY_MARGIN.
+    Returns (token, from_cache).
+    """
+    cache = load_cache()
+    token = cache.get("token")
+    expiry = cache.get("expiry", 0)
+
+    if use_cache and token and expiry - TOKEN_EXPIRY_MARGIN > time.time():
+        log_step(1, "IAM Token 획득", "success", {
+            "source": "cache",
+            "expires_in": f"{int(expiry - time.time())}초",
+            "token_preview": f"{token[:50]}...{token[-20:]}"
+        })
+        return token, True
+
+    token, expires_in = step1_get_iam_token()
+    if token:
+        cache["token"] = token
+        cache["expiry"] = time.time() + expires_in
+        save_cache(cache)
+    return token, False
+
+def get_cached_service_crn(bearer_token, use_cache=True):
+    """
+    Step 2 (cached): Reuse the Service CRN, which is stable for the instance lifetime.
+    Returns (crn, from_cache).
+    """
+    cache = load_cache()
+    crns = cache.get("service_crn", {})
+    crn = crns.get(QISKIT_RUNTIME_RESOURCE_ID)
+
+    if use_cache and crn:
+        log_step(2, "Service CRN 조회", "success", {
+            "source": "cache",
+            "crn": crn
+        })
+        return crn, True
+
+    crn = step2_get_service_crn(bearer_token)
+    if crn:
+        crns[QISKIT_RUNTIME_RESOURCE_ID] = crn
+        cache["service_crn"] = crns
+        save_cache(cache)
+    return crn, False
+
+@functools.lru_cache(maxsize=4)
+def _auth_headers(bearer_token, service_crn):
+    """
+    Quantum API headers for a token/CRN pair, built once and reused by
+    every request (including each step 5 poll). Treat as read-only.
+    """
+    return {
+        "Authorization": f"Bearer {bearer_token}",
+        "Service-CRN": service_crn,
+        "IBM-API-Version": IBM_API_VERSION
+    }
+
+def _as_dict(value):
+    """Return value if it is a dict, else the shared empty dict"""
+    return value if isinstance(value, dict) else _EMPTY
+
+def _summarize_backend(backend):
+    """Reduce a raw backend record to the fields shown in the report"""
+    status = _as_dict(backend.get("status", backend.get("backend_status")))
+    return {
+        "name": backend.get("name", backend.get("backend_name", "unknown")),
+        "qubits": backend.get("n_qubits", backend.get("num_qubits", "N/A")),
+        "operational": status.get("operational", True),
+        "pending_jobs": status.get("pending_jobs", 0),
+        "processor": _as_dict(backend.get("processor_type")).get("family", "Unknown")
+    }
+
 def step3_get_backends(bearer_token, service_crn):
-    """Step 3: List available QPU backends"""
+    """
+    Step 3: List available QPU backends
+
+    On an HTTP error returns ({"status_code": ...}, None) so the caller can
+    tell rejected credentials apart from other failures.
+    """
     log_step(3, "QPU 백엔드 목록 조회", "in_progress")
 
     try:
-        headers = {
-            "Authorization": f"Bearer {bearer_token}",
-            "Service-CRN": service_crn,
-            "IBM-API-Version": "2025-05-01"
-        }
-
-        response = requests.get(
+        response = SESSION.get(
             f"{QUANTUM_API_URL}/backends",
-            headers=headers,
+            headers=_auth_headers(bearer_token, service_crn),
             timeout=30
         )
 
         if response.status_code == 200:
-            backends = response.json()
+            backends = _loads(response.content)
 
             # Filter and format backend info
-            backend_list = []
-            for backend in backends.get("devices", backends) if isinstance(backends, dict) else backends:
-                if isinstance(backend, dict):
-                    name = backend.get("name", backend.get("backend_name", "unknown"))
-                    n_qubits = backend.get("n_qubits", backend.get("num_qubits", "N/A"))
-                    status = backend.get("status", backend.get("backend_status", {}))
-                    operational = status.get("operational", True) if isinstance(status, dict) else True
-                    pending_jobs = status.get("pending_jobs", 0) if isinstance(status, dict) else 0
-                    processor_type = backend.get("processor_type", {})
-
-                    backend_list.append({
-                        "name": name,
-                        "qubits": n_qubits,
-                        "operational": operational,
-                        "pending_jobs": pending_jobs,
-                        "processor": processor_type.get("family", "Unknown") if isinstance(processor_type, dict) else "Unknown"
-                    })
+            devices = backends.get("devices", backends) if isinstance(backends, dict) else backends
+            backend_list = [
+                _summarize_backend(backend)
+                for backend in devices
+                if isinstance(backend, dict)
+            ]
 
             log_step(3, "QPU 백엔드 목록 조회", "success", {
                 "total_backends": len(backend_list),
@@ -174,13 +402,39 @@ def step3_get_backends(bearer_token, service_crn):
         else:
             log_step(3, "QPU 백엔드 목록 조회", "error",
                     {"status_code": response.status_code},
-                    response.text)
-            return None, None
+                    response.content)
+            return {"status_code": response.status_code}, None
 
     except Exception as e:
         log_step(3, "QPU 백엔드 목록 조회", "error", error=str(e))
         return None, None
 
+def select_backend(backend_list, preferred="ibm_fez"):
+    """
+    Pick the preferred backend if it is operational, otherwise the
+    operational backend with the fewest pending jobs.
+    Falls back to preferred when no backend is operational.
+    """
+    if np is not None:
+        arr = np.array(
+            [(b["name"], b["pending_jobs"], b["operational"]) for b in backend_list],
+            dtype=[("name", "U64"), ("pending", "i4"), ("op", "?")]
+        )
+        cand = arr[arr["op"]]
+        if len(cand) == 0:
+            return preferred
+        if preferred in cand["name"]:
+            return preferred
+        return str(cand["name"][np.argmin(cand["pending"])])
+
+    cand = [b for b in backend_list if b["operational"]]
+    if not cand:
+        return preferred
+    if any(b["name"] == preferred for b in cand):
+        return preferred
+    return min(cand, key=lambda b: b["pending_jobs"])["name"]
+
+@functools.lru_cache(maxsize=8)
 def get_transpiled_bell_state_qasm(n_qubits=156):
     """
     Generate transpiled Bell State QASM for Heron processor
@@ -188,32 +442,32 @@ def get_transpiled_bell_state_qasm(n_qubits=156):
 
     H gate decomposition: Rz(π/2) → SX → Rz(π/2)
     CX decomposition: H(target) → CZ → H(target)
-    """
-    pi_2 = math.pi / 2
 
+    Cached per n_qubits: the circuit text is identical for every job.
+    """
     qasm = f'''OPENQASM 3.0;
 include "stdgates.inc";
 qubit[{n_qubits}] q;
 bit[2] c;
 
 // H gate on q[0]: Rz(π/2) → SX → Rz(π/2)
-rz({pi_2}) q[0];
+rz({PI_2}) q[0];
 sx q[0];
-rz({pi_2}) q[0];
+rz({PI_2}) q[0];
 
 // CX(q[0], q[1]) = H(q[1]) → CZ(q[0], q[1]) → H(q[1])
 // First H on q[1]
-rz({pi_2}) q[1];
+rz({PI_2}) q[1];
 sx q[1];
-rz({pi_2}) q[1];
+rz({PI_2}) q[1];
 
 // CZ gate (native)
 cz q[0], q[1];
 
 // Second H on q[1]
-rz({pi_2}) q[1];
+rz({PI_2}) q[1];
 sx q[1];
-rz({pi_2}) q[1];
+rz({PI_2}) q[1];
 
 // Measure
 c[0] = measure q[0];
@@ -221,49 +475,57 @@ c[1] = measure q[1];
 '''
     return qasm
 
-def step4_submit_job(bearer_token, service_crn, backend_name="ibm_fez"):
-    """Step 4: Submit Bell State circuit to QPU"""
-    log_step(4, f"Bell State Job 제출 ({backend_name})", "in_progress")
+def step4_submit_job(bearer_token, service_crn, backend_name="ibm_fez", qasm_list=None):
+    """
+    Step 4: Submit circuit(s) to QPU as one sampler job
 
-    try:
-        headers = {
-            "Authorization": f"Bearer {bearer_token}",
-            "Service-CRN": service_crn,
-            "IBM-API-Version": "2025-05-01",
-            "Content-Type": "application/json"
-        }
+    Every QASM string in qasm_list becomes one PUB of a single sampler job,
+    so N circuits wait in the queue once instead of N times. All PUBs in a
+    job run on the same backend and share options.default_shots.
+    Defaults to the single transpiled Bell State circuit; an empty
+    qasm_list is rejected without submitting anything.
+    """
+    # Get transpiled QASM
+    if qasm_list is None:
+        qasm_list = [get_transpiled_bell_state_qasm(156)]
 
-        # Get transpiled QASM
-        transpiled_qasm = get_transpiled_bell_state_qasm(156)
+    title = f"Sampler Job 제출 ({backend_name}, {len(qasm_list)} PUB)"
+    if not qasm_list:
+        log_step(4, title, "error", error="qasm_list is empty: at least one circuit is required")
+        return None, None
+
+    log_step(4, title, "in_progress")
 
+    try:
         # Prepare job data with Primitives V2
         job_data = {
             "program_id": "sampler",
             "backend": backend_name,
             "params": {
                 "version": 2,
-                "pubs": [[transpiled_qasm]],
+                "pubs": [[qasm] for qasm in qasm_list],
                 "options": {
                     "default_shots": 1024
                 }
             }
         }
 
-        print(f"\n📤 Submitting to {backend_name}...")
-        print(f"Circuit (transpiled):\n{transpiled_qasm[:500]}...")
+        if VERBOSE:
+            print(f"\n📤 Submitting {len(qasm_list)} circuit(s) to {backend_name}...")
+            print(f"Circuit (transpiled):\n{qasm_list[0][:500]}...")
 
-        response = requests.post(
+        response = SESSION.post(
             f"{QUANTUM_API_URL}/jobs",
-            headers=headers,
+            headers=_auth_headers(bearer_token, service_crn),
             json=job_data,
             timeout=60
         )
 
         if response.status_code in [200, 201]:
-            job_info = response.json()
+            job_info = _loads(response.content)
             job_id = job_info.get("id")
 
-            log_step(4, f"Bell State Job 제출 ({backend_name})", "success", {
+            log_step(4, title, "success", {
                 "job_id": job_id,
                 "status": job_info.get("status"),
                 "backend": job_info.get("backend"),
@@ -271,11 +533,16 @@ def step4_submit_job(bearer_token, service_crn, backend_name="ibm_fez"):
             })
             return job_id, job_info
         else:
-            error_data = response.json() if response.text else {}
+            try:
+                error_data = _loads(response.content)
+            except ValueError:
+                error_data = {}
+            if not isinstance(error_data, dict):
+                error_data = {}
             error_code = error_data.get("code", response.status_code)
-            error_message = error_data.get("message", response.text)
+            error_message = error_data.get("message") or response.content.decode("utf-8", "replace")
 
-            log_step(4, f"Bell State Job 제출 ({backend_name})", "error", {
+            log_step(4, title, "error", {
                 "status_code": response.status_code,
                 "error_code": error_code,
                 "error_message": error_message
@@ -283,7 +550,7 @@ def step4_submit_job(bearer_token, service_crn, backend_name="ibm_fez"):
             return None, error_data
 
     except Exception as e:
-        log_step(4, f"Bell State Job 제출 ({backend_name})", "error", error=str(e))
+        log_step(4, title, "error", error=str(e))
         return None, None
 
 def step5_poll_job_status(bearer_token, service_crn, job_id, max_wait=300):
@@ -291,28 +558,28 @@ def step5_poll_job_status(bearer_token, service_crn, job_id, max_wait=300):
     log_step(5, f"Job 상태 폴링 ({job_id})", "in_progress")
 
     try:
-        headers = {
-            "Authorization": f"Bearer {bearer_token}",
-            "Service-CRN": service_crn,
-            "IBM-API-Version": "2025-05-01"
-        }
-
         start_time = time.time()
         poll_count = 0
 
         while (time.time() - start_time) < max_wait:
+            # First poll right after submission, then back off exponentially
+            if poll_count:
+                delay = min(POLL_MAX_DELAY, POLL_BASE_DELAY * (1.5 ** min(poll_count, 8)))
+                time.sleep(delay * random.uniform(0.8, 1.2))
+
             poll_count += 1
-            response = requests.get(
+            response = SESSION.get(
                 f"{QUANTUM_API_URL}/jobs/{job_id}",
-                headers=headers,
+                headers=_auth_headers(bearer_token, service_crn),
                 timeout=30
             )
 
             if response.status_code == 200:
-                job_info = response.json()
+                job_info = _loads(response.content)
                 status = job_info.get("status", "").upper()
 
-                print(f"  ⏳ Poll #{poll_count}: Status = {status}")
+                if VERBOSE:
+                    print(f"  ⏳ Poll #{poll_count}: Status = {status}")
 
                 if status == "COMPLETED":
                     elapsed = time.time() - start_time
@@ -329,12 +596,11 @@ def step5_poll_job_status(bearer_token, service_crn, job_id, max_wait=300):
                         "error_message": job_info.get("error_message", "Unknown error")
                     }, f"Job {status}")
                     return job_info
-
-                # Wait before next poll
-                time.sleep(5)
             else:
-                print(f"  ⚠️ Poll error: {response.status_code}")
-                time.sleep(5)
+                log_step(5, f"Job 상태 폴링 ({job_id})", "error",
+                        {"status_code": response.status_code},
+                        response.content)
+                return None
 
         log_step(5, f"Job 상태 폴링 ({job_id})", "error",
                 error=f"Timeout after {max_wait}초")
@@ -349,20 +615,17 @@ def step6_get_results(bearer_token, service_crn, job_id):
     log_step(6, f"결과 조회 ({job_id})", "in_progress")
 
     try:
-        headers = {
-            "Authorization": f"Bearer {bearer_token}",
-            "Service-CRN": service_crn,
-            "IBM-API-Version": "2025-05-01"
-        }
-
-        response = requests.get(
+        # Stream the (possibly large) body in 64KB chunks into one buffer
+        with SESSION.get(
             f"{QUANTUM_API_URL}/jobs/{job_id}/results",
-            headers=headers,
+            headers=_auth_headers(bearer_token, service_crn),
+            stream=True,
             timeout=30
-        )
+        ) as response:
+            body = b"".join(response.iter_content(RESULTS_CHUNK_SIZE))
 
         if response.status_code == 200:
-            results = response.json()
+            results = _loads(body)
 
             # Parse measurement results
             measurement_data = analyze_bell_state_results(results)
@@ -372,62 +635,141 @@ def step6_get_results(bearer_token, service_crn, job_id):
         else:
             log_step(6, f"결과 조회 ({job_id})", "error",
                     {"status_code": response.status_code},
-                    response.text)
+                    body)
             return None, None
 
     except Exception as e:
         log_step(6, f"결과 조회 ({job_id})", "error", error=str(e))
         return None, None
 
+def _pub_counts(pub_result):
+    """Extract the counts dict from one PUB result"""
+    if "data" in pub_result:
+        return pub_result["data"].get("c", pub_result["data"])
+    elif "counts" in pub_result:
+        return pub_result["counts"]
+    return {}
+
+def _count_stats(counts):
+    """
+    Total shots, correlated shots and top outcomes, in one pass over counts.
+    The preview is ordered by count, then bitstring, both descending.
+    """
+    total = 0
+    correlated = 0
+    top = []  # Min-heap of the COUNTS_PREVIEW_SIZE largest (count, key) pairs
+    for key, value in counts.items():
+        total += value
+        if key in BELL_CORRELATED_KEYS:
+            correlated += value
+        if len(top) < COUNTS_PREVIEW_SIZE:
+            heapq.heappush(top, (value, key))
+        elif (value, key) > top[0]:
+            heapq.heapreplace(top, (value, key))
+    preview = [(key, value) for value, key in sorted(top, reverse=True)]
+    return total, correlated, preview
+
+def _count_stats_numpy(counts):
+    """Vectorized _count_stats for large shot distributions"""
+    keys = np.array(list(counts.keys()))
+    values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    total = int(values.sum())
+    correlated = int(values[np.isin(keys, list(BELL_CORRELATED_KEYS))].sum())
+
+    # Candidates are everything tied with or above the 10th largest count;
+    # order them by (count, key) descending, the same tie-break as _count_stats
+    kth = np.partition(values, -COUNTS_PREVIEW_SIZE)[-COUNTS_PREVIEW_SIZE]
+    cand = np.flatnonzero(values >= kth)
+    top = cand[np.lexsort((keys[cand], values[cand]))[::-1][:COUNTS_PREVIEW_SIZE]]
+    preview = [(str(keys[i]), int(values[i])) for i in top]
+    return total, correlated, preview
+
+def _analyze_counts(counts, raw):
+    """Bell State statistics for a single counts dict"""
+    total = correlated = 0
+    preview = []
+
+    if isinstance(counts, dict):
+        if np is not None and len(counts) >= NUMPY_MIN_OUTCOMES:
+            total, correlated, preview = _count_stats_numpy(counts)
+        else:
+            total, correlated, preview = _count_stats(counts)
+
+    if total > 0:
+        # Bell state analysis
+        uncorrelated = total - correlated
+        fidelity = (correlated / total) * 100
+
+        return {
+            "total_shots": total,
+            "counts": dict(preview),  # Top 10 by count
+            "correlated_count": correlated,
+            "uncorrelated_count": uncorrelated,
+            "fidelity": f"{fidelity:.1f}%"
+        }
+
+    return {
+        "raw_results": str(raw)[:500]
+    }
+
 def analyze_bell_state_results(results):
-    """Analyze Bell State measurement results"""
+    """
+    Analyze Bell State measurement results
+
+    A single-PUB job returns its analysis directly; a batched job returns
+    one analysis per PUB under "pubs", in submission order.
+    """
     try:
         # Extract counts from results structure
         # Structure varies, try common patterns
-        counts = {}
+        pubs = []
 
         if isinstance(results, dict):
             if "results" in results:
                 res_data = results["results"]
-                if isinstance(res_data, list) and len(res_data) > 0:
-                    pub_result = res_data[0]
-                    if "data" in pub_result:
-                        counts = pub_result["data"].get("c", pub_result["data"])
-                    elif "counts" in pub_result:
-                        counts = pub_result["counts"]
+                if isinstance(res_data, list):
+                    pubs = [(_pub_counts(pub_result), pub_result) for pub_result in res_data]
             elif "counts" in results:
-                counts = results["counts"]
-
-        if not counts:
-            counts = results  # Fallback
-
-        # Calculate statistics
-        total = sum(counts.values()) if isinstance(counts, dict) else 0
-
-        if total > 0:
-            # Bell state analysis
-            correlated = counts.get("00", 0) + counts.get("11", 0) + \
-                        counts.get("0x0", 0) + counts.get("0x3", 0)  # Handle hex format
-            uncorrelated = total - correlated
-            fidelity = (correlated / total) * 100 if total > 0 else 0
-
-            analysis = {
-                "total_shots": total,
-                "counts": dict(list(counts.items())[:10]),  # First 10
-                "correlated_count": correlated,
-                "uncorrelated_count": uncorrelated,
-                "fidelity": f"{fidelity:.1f}%"
-            }
-        else:
-            analysis = {
-                "raw_results": str(results)[:500]
-            }
+                pubs = [(results["counts"], results)]
+
+        if not pubs or (len(pubs) == 1 and not pubs[0][0]):
+            pubs = [(results, results)]  # Fallback
 
-        return analysis
+        analyses = [_analyze_counts(counts, raw) for counts, raw in pubs]
+        if len(analyses) == 1:
+            return analyses[0]
+        return {"pubs": analyses}
 
     except Exception as e:
         return {"parse_error": str(e), "raw": str(results)[:500]}
 
+def summary_line(summary):
+    """One-line run summary: job, backend and per-PUB fidelity"""
+    analysis = summary.get("analysis") or {}
+    pubs = analysis.get("pubs", [analysis])
+    fidelity = ", ".join(str(pub.get("fidelity", "N/A")) for pub in pubs)
+    return f"\n📊 Job {summary['job_id']} ({summary['backend']}) - fidelity: {fidelity}"
+
+def authenticate(use_cache=True):
+    """
+    Steps 1-2: Return (bearer_token, service_crn, from_cache), or
+    (None, None, False) on failure. from_cache is True if either value
+    was served from the cache.
+    """
+    # Step 1: Get IAM Token
+    bearer_token, token_cached = get_cached_iam_token(use_cache)
+    if not bearer_token:
+        print("\n❌ IAM Token 획득 실패. 테스트 중단.")
+        return None, None, False
+
+    # Step 2: Get Service CRN
+    service_crn, crn_cached = get_cached_service_crn(bearer_token, use_cache)
+    if not service_crn:
+        print("\n❌ Service CRN 조회 실패. 테스트 중단.")
+        return None, None, False
+
+    return bearer_token, service_crn, token_cached or crn_cached
+
 def main():
     """Run complete IBM Quantum integration test"""
     print("\n" + "="*70)
@@ -436,32 +778,35 @@ def main():
     print(f"시작 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*70)
 
-    # Step 1: Get IAM Token
-    bearer_token = step1_get_iam_token()
-    if not bearer_token:
-        print("\n❌ IAM Token 획득 실패. 테스트 중단.")
+    # Fail fast before any network call if the API key is missing
+    if not API_KEY:
+        log_step(1, "IAM Token 획득", "error",
+                error="IBM_QUANTUM_API_KEY environment variable is not set")
+        print("\n❌ IBM_QUANTUM_API_KEY 미설정. 테스트 중단.")
         return test_results
 
-    # Step 2: Get Service CRN
-    service_crn = step2_get_service_crn(bearer_token)
+    # Steps 1-2: IAM Token and Service CRN (from cache when available)
+    bearer_token, service_crn, used_cache = authenticate()
     if not service_crn:
-        print("\n❌ Service CRN 조회 실패. 테스트 중단.")
         return test_results
 
     # Step 3: Get Backends
     backends_raw, backends_list = step3_get_backends(bearer_token, service_crn)
+    if (not backends_list and used_cache and backends_raw
+            and backends_raw.get("status_code") in STALE_CREDENTIAL_STATUS):
+        # Cached token revoked or CRN stale: drop the cache and re-authenticate once
+        print("\n⚠️ 캐시된 인증 정보 거부됨. 캐시 삭제 후 재시도.")
+        clear_cached_credentials()
+        bearer_token, service_crn, _ = authenticate(use_cache=False)
+        if not service_crn:
+            return test_results
+        backends_raw, backends_list = step3_get_backends(bearer_token, service_crn)
     if not backends_list:
         print("\n❌ 백엔드 목록 조회 실패. 테스트 중단.")
         return test_results
 
     # Find best backend (prefer ibm_fez or lowest queue)
-    target_backend = "ibm_fez"  # Default
-    for backend in backends_list:
-        if backend.get("name") == "ibm_fez" and backend.get("operational"):
-            target_backend = "ibm_fez"
-            break
-        elif backend.get("operational") and backend.get("pending_jobs", 999) < 100:
-            target_backend = backend.get("name")
+    target_backend = select_backend(backends_list)
 
     print(f"\n🎯 선택된 백엔드: {target_backend}")
 
@@ -481,10 +826,6 @@ def main():
     results, analysis = step6_get_results(bearer_token, service_crn, job_id)
 
     # Final Summary
-    print("\n" + "="*70)
-    print("📊 테스트 완료 요약")
-    print("="*70)
-
     test_results["success"] = True
     test_results["summary"] = {
         "job_id": job_id,
@@ -492,7 +833,13 @@ def main():
         "analysis": analysis
     }
 
-    print(json.dumps(test_results["summary"], indent=2, ensure_ascii=False))
+    if VERBOSE:
+        print("\n" + "="*70)
+        print("📊 테스트 완료 요약")
+        print("="*70)
+        print(_dumps(test_results["summary"]))
+    else:
+        print(summary_line(test_results["summary"]))
 
     return test_results
 
@@ -500,7 +847,7 @@ if __name__ == "__main__":
     results = main()
 
     # Save results to file
-    with open("/Users/eunmin/Desktop/WORK/SwiftQuantum/Scripts/test_results.json", "w") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False, default=str)
-
-    print(f"\n📁 결과 저장됨: Scripts/test_results.json")
+    if save_results(results):
+        print(f"\n📁 결과 저장됨: {RESULTS_PATH}")
+    else:
+        print(f"\n📁 결과 변경 없음: {RESULTS_PATH}")